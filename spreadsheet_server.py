@@ -10,20 +10,77 @@ Usage: run as the MCP stdio server (keeps reading JSON-RPC lines from stdin)
 """
 
 import asyncio
+import contextlib
+import fnmatch
+from collections import OrderedDict
+import functools
+import io
 import json
 import logging
+import os
+import re
 import sys
+import threading
+import weakref
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict
 import csv
 import datetime
 from decimal import Decimal
+from itertools import chain, islice
 
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter, column_index_from_string, range_boundaries
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.chart import BarChart, PieChart, Reference
 
+try:
+    import xlsxwriter
+except ImportError:  # optional backend for creating new files
+    xlsxwriter = None
+
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+except ImportError:  # optional C reader for large CSV files
+    pyarrow = pacsv = None
+
+try:
+    import orjson
+except ImportError:  # stdlib json is used when orjson isn't installed
+    orjson = None
+
+
+def _json_dumps_std(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# 19+ digits in a row may be an integer outside 64 bits, which orjson reads as a float
+_LONG_DIGITS = re.compile(rb"\d{19}")
+
+if orjson is not None:
+    def json_dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Integers beyond 64 bits; stdlib json writes them exactly
+            return _json_dumps_std(obj)
+
+    def json_loads(data):
+        # Lines orjson would read differently from stdlib json (big integers) or
+        # reject (numbers overflowing a double, e.g. 1e400) go to stdlib json
+        if _LONG_DIGITS.search(data):
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+else:
+    json_dumps = _json_dumps_std
+    json_loads = json.loads
+
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 logger = logging.getLogger("spreadsheet-mcp-server")
 
@@ -42,21 +99,242 @@ def serialize_cell_value(value):
 
 
 
+BACKENDS = ("openpyxl", "xlsxwriter")
+WORKBOOK_CACHE_SIZE = 4
+CSV_BUFFER_SIZE = 1 << 20
+# Whole-file CSV reads at least this big go through pyarrow when it is installed
+CSV_ARROW_MIN_SIZE = 1 << 20
+# Longest JSON-RPC line accepted on stdin (write_spreadsheet payloads can be large)
+STDIN_LIMIT = 1 << 26
+# Tool calls that may run at once; each holds a worker thread while it loads or saves
+MAX_CONCURRENT_CALLS = (os.cpu_count() or 1) * 2
+# Tool arguments naming the files a call touches (locked for the duration of the call)
+FILE_ARGUMENTS = ("filename", "old_filename", "new_filename")
+# Sheet edits that apply_ops can batch; each has a matching _do_<name>(ws, ...)
+BATCH_OPS = ("update_cell", "set_formula", "set_cell_format", "set_column_format",
+             "set_row_format", "format_cells", "freeze_panes", "unfreeze_panes",
+             "set_text_wrap", "set_cell_alignment", "create_chart")
+
+
+def _new_write_only_workbook(sheet_name: str):
+    """Create a streaming workbook with a single sheet; returns (wb, ws)"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    return wb, ws
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize_color(color: Optional[str]) -> Optional[str]:
+    """Convert RGB hex color to ARGB format for openpyxl"""
+    if not color:
+        return None
+
+    # Remove # if present
+    color = color.lstrip('#')
+
+    # If it's 6 characters (RGB), prepend FF for full opacity
+    if len(color) == 6:
+        return 'FF' + color.upper()
+    # If it's already 8 characters (ARGB), use as-is
+    elif len(color) == 8:
+        return color.upper()
+    else:
+        raise ValueError(f"Invalid color format: {color}. Use #RRGGBB or AARRGGBB")
+
+
+@functools.lru_cache(maxsize=256)
+def _font(bold: bool = False, italic: bool = False, size: Optional[float] = None) -> Font:
+    """One shared Font per (bold, italic, size) combination"""
+    return Font(bold=bold, italic=italic, size=size)
+
+
+@functools.lru_cache(maxsize=256)
+def _solid_fill(argb: str) -> PatternFill:
+    """One shared PatternFill per ARGB color"""
+    return PatternFill(start_color=argb, fill_type="solid")
+
+
+def _read_csv_arrow(path: Path) -> Optional[list]:
+    """
+    Parse a whole CSV with pyarrow's C reader into rows of strings, as csv.reader
+    would. Returns None for files it can't reproduce exactly (e.g. ragged rows).
+    """
+    raw = path.read_bytes()
+    # csv.reader gives [] for a blank line where pyarrow gives a row of "", and keeps a
+    # UTF-8 BOM that pyarrow strips: leave those files to csv
+    if raw.startswith((b"\n", b"\r", b"\xef\xbb\xbf")) or any(blank in raw for blank in (b"\n\n", b"\n\r\n", b"\r\r")):
+        return None
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        first_row = next(csv.reader(f), None)
+    if not first_row:
+        return None
+    # Name the columns ourselves so no row is taken as a header and nothing is type-inferred
+    names = [f"c{i}" for i in range(len(first_row))]
+    try:
+        table = pacsv.read_csv(
+            pyarrow.BufferReader(raw),
+            read_options=pacsv.ReadOptions(column_names=names, block_size=4 << 20),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True, ignore_empty_lines=False),
+            convert_options=pacsv.ConvertOptions(column_types={n: pyarrow.string() for n in names},
+                                                 strings_can_be_null=False))
+    except pyarrow.ArrowException:
+        return None
+    return [list(row) for row in zip(*(column.to_pylist() for column in table.columns))]
+
+
+@functools.lru_cache(maxsize=64)
+def _empty_xlsx_template(sheet_name: str) -> bytes:
+    """Bytes of an empty single-sheet workbook, built once per sheet name"""
+    wb, _ = _new_write_only_workbook(sheet_name)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
 class SpreadsheetServer:
-    def __init__(self, base_path: str = "spreadsheets", import_path: str = "/imports"):
+    def __init__(self, base_path: str = "spreadsheets", import_path: str = "/imports",
+                 backend: str = "openpyxl"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Use one of {', '.join(BACKENDS)}")
+        if backend == "xlsxwriter" and xlsxwriter is None:
+            raise ValueError("The xlsxwriter backend requires the xlsxwriter package")
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        # resolved once; base_path is fixed for the lifetime of the server
+        self._base_resolved = self.base_path.resolve()
         self.import_path = Path(import_path)
-        logger.info(f"Initialized with base path: {self.base_path}, import path: {self.import_path}")
+        self.backend = backend
+        # path -> ((mtime_ns, size), workbook) for recently used xlsx files
+        self._wb_cache: "OrderedDict[Path, Tuple[Tuple[int, int], openpyxl.Workbook]]" = OrderedDict()
+        # worker threads of calls on different files share _wb_cache
+        self._wb_cache_lock = threading.Lock()
+        # resolved path -> lock serializing tool calls on that file; entries vanish when unused
+        self._file_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        logger.info(f"Initialized with base path: {self.base_path}, import path: {self.import_path}, "
+                    f"backend: {self.backend}")
+
+    def _lock_key(self, filename: str) -> str:
+        # Key on the resolved path so "a.csv", "./a.csv" and "sub/../a.csv" share a lock;
+        # a name escaping base_path is rejected by the call itself, so any key will do
+        try:
+            return str(self._resolve_path(filename))
+        except ValueError:
+            return os.path.normpath(filename)
+
+    def _file_lock(self, key: str) -> asyncio.Lock:
+        lock = self._file_locks.get(key)
+        if lock is None:
+            lock = self._file_locks[key] = asyncio.Lock()
+        return lock
+
+    @contextlib.asynccontextmanager
+    async def lock_files(self, *filenames: str):
+        """Hold the locks of every named file, taken in sorted order so two calls can't deadlock"""
+        async with contextlib.AsyncExitStack() as stack:
+            for key in sorted({self._lock_key(f) for f in filenames}):
+                await stack.enter_async_context(self._file_lock(key))
+            yield
 
     def _resolve_path(self, filename: str, check_exists: bool = False) -> Path:
-        path = (self.base_path / filename).resolve()
-        if not str(path).startswith(str(self.base_path.resolve())):
+        path = (self._base_resolved / filename).resolve()
+        if not path.is_relative_to(self._base_resolved):
             raise ValueError("Path traversal not allowed")
         if check_exists and not path.exists():
             raise FileNotFoundError(f"File not found: {filename}")
         return path
 
+    @staticmethod
+    def _file_signature(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _load_workbook(self, path: Path, checkout: bool = True):
+        """
+        Return the parsed workbook for path, reusing the cached parse while the
+        file is unchanged on disk. A checked-out workbook leaves the cache until
+        _commit_workbook saves it, so an edit that fails halfway is never reused.
+        """
+        signature = self._file_signature(path)
+        with self._wb_cache_lock:
+            entry = self._wb_cache.pop(path, None) if checkout else self._wb_cache.get(path)
+            if entry is not None and entry[0] == signature:
+                if not checkout:
+                    self._wb_cache.move_to_end(path)
+                return entry[1]
+        wb = openpyxl.load_workbook(path)
+        if not checkout:
+            self._cache_workbook(path, signature, wb)
+        return wb
+
+    def _cache_workbook(self, path: Path, signature: Tuple[int, int], wb) -> None:
+        with self._wb_cache_lock:
+            self._wb_cache[path] = (signature, wb)
+            self._wb_cache.move_to_end(path)
+            while len(self._wb_cache) > WORKBOOK_CACHE_SIZE:
+                self._wb_cache.popitem(last=False)
+
+    def _commit_workbook(self, wb, path: Path) -> None:
+        """Save a workbook and keep its parse cached for the next call"""
+        self._save_workbook(wb, path)
+        self._cache_workbook(path, self._file_signature(path), wb)
+
+    @staticmethod
+    async def _to_thread(path: Path, fn, *args):
+        """
+        Run blocking IO on path in a worker thread. Callers skip the up-front exists()
+        check: a missing file is reported here, as _resolve_path(check_exists=True) would.
+        """
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {path.name}") from None
+
+    async def _load(self, path: Path, checkout: bool = True):
+        """_load_workbook on a worker thread so the event loop keeps serving requests"""
+        return await self._to_thread(path, self._load_workbook, path, checkout)
+
+    async def _save(self, wb, path: Path) -> None:
+        """_commit_workbook on a worker thread"""
+        await asyncio.to_thread(self._commit_workbook, wb, path)
+
+    def _forget_workbook(self, path: Path) -> None:
+        with self._wb_cache_lock:
+            self._wb_cache.pop(path, None)
+
+    def _save_workbook(self, wb, path: Path) -> None:
+        """Write a workbook to disk (single point where workbooks are serialized)"""
+        wb.save(path)
+
+    def _write_bytes(self, path: Path, data: bytes) -> None:
+        """Write a pre-serialized file to disk"""
+        path.write_bytes(data)
+
+    def _write_xlsx(self, path: Path, sheet_name: str, headers: Optional[list] = None) -> None:
+        """Write a new single-sheet xlsx file with an optional bold header row"""
+        if self.backend == "xlsxwriter":
+            # xlsxwriter streams rows straight into the zip and never reads back
+            wb = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+            ws = wb.add_worksheet(sheet_name)
+            if headers:
+                ws.write_row(0, 0, headers, wb.add_format({"bold": True}))
+            wb.close()
+            return
+
+        if not headers:
+            # An empty workbook only differs by sheet name: reuse its bytes
+            self._write_bytes(path, _empty_xlsx_template(sheet_name))
+            return
+
+        wb, ws = _new_write_only_workbook(sheet_name)
+        bold = _font(bold=True)
+        row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = bold
+            row.append(cell)
+        ws.append(row)
+        self._save_workbook(wb, path)
+
     def _sanitize_sheet_name(self, name: str) -> str:
         """
         Sanitize sheet name by removing invalid characters.
@@ -81,41 +359,68 @@ class SpreadsheetServer:
         return name
 
 
+    @staticmethod
+    def _clear_cells(ws) -> None:
+        """
+        Drop every cell of ws, like ws.delete_rows(1, ws.max_row) but without
+        shifting cells row by row. Everything else on the sheet stays: charts,
+        merges, validations, conditional formats, row/column dimensions, views.
+        Relies on purpose on openpyxl's private cell store (_cells) and append
+        cursor (_current_row); test_clear_cells_openpyxl_internals guards them.
+        """
+        ws._cells.clear()
+        ws._current_row = 0
+
     # ---------------------- file / sheet utilities ----------------------
     async def list_files(self, pattern: str = "*") -> dict:
         files = []
-        for path in self.base_path.glob(pattern):
-            if path.is_file() and path.suffix.lower() in [".xlsx", ".csv"]:
-                files.append({
-                    "name": path.name,
-                    "size": path.stat().st_size,
-                    "type": path.suffix.lower()
-                })
+        if "/" in pattern or "\\" in pattern:
+            # Patterns that reach into subdirectories still need glob
+            for path in self.base_path.glob(pattern):
+                if path.is_file() and path.suffix.lower() in [".xlsx", ".csv"]:
+                    files.append({
+                        "name": path.name,
+                        "size": path.stat().st_size,
+                        "type": path.suffix.lower()
+                    })
+        else:
+            # One directory read; DirEntry already knows each entry's type
+            with os.scandir(self.base_path) as entries:
+                for entry in entries:
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in (".xlsx", ".csv") and fnmatch.fnmatch(entry.name, pattern) and entry.is_file():
+                        files.append({
+                            "name": entry.name,
+                            "size": entry.stat().st_size,
+                            "type": ext
+                        })
         return {"success": True, "files": files, "count": len(files)}
 
     async def create_spreadsheet(self, filename: str, format: str = "xlsx",
                                  headers: Optional[list] = None,
                                  sheet_name: str = "Sheet1") -> dict:
-        if not filename.endswith(f".{format}"):
-            filename = f"{filename}.{format}"
+        return await asyncio.to_thread(self.create_spreadsheet_sync, filename, format,
+                                       headers, sheet_name)
+
+    @staticmethod
+    def _with_extension(filename: str, format: str) -> str:
+        """The name create_spreadsheet actually writes: filename plus .format unless already there"""
+        return filename if filename.endswith(f".{format}") else f"{filename}.{format}"
+
+    def create_spreadsheet_sync(self, filename: str, format: str = "xlsx",
+                                headers: Optional[list] = None,
+                                sheet_name: str = "Sheet1") -> dict:
+        """Blocking implementation of create_spreadsheet, usable from sync callers"""
+        filename = self._with_extension(filename, format)
         path = self._resolve_path(filename)
 
         if path.exists():
             return {"success": False, "error": f"File {filename} already exists"}
 
         if format == "xlsx":
-            wb = openpyxl.Workbook()
-            ws = wb.active
-
             # Sanitize the sheet name
             sanitized_name = self._sanitize_sheet_name(sheet_name)
-            ws.title = sanitized_name
-
-            if headers:
-                ws.append(headers)
-                for cell in ws[1]:
-                    cell.font = Font(bold=True)
-            wb.save(path)
+            self._write_xlsx(path, sanitized_name, headers)
 
             return {
                 "success": True,
@@ -138,11 +443,13 @@ class SpreadsheetServer:
         if new.exists():
             return {"success": False, "error": "Target filename already exists"}
         old.rename(new)
+        self._forget_workbook(old)
+        self._forget_workbook(new)
         return {"success": True, "old": old.name, "new": new.name}
 
     async def rename_sheet(self, filename: str, old_sheet: str, new_sheet: str) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
+        path = self._resolve_path(filename)
+        wb = await self._load(path)
         if old_sheet not in wb.sheetnames:
             return {"success": False, "error": f"Sheet {old_sheet} not found"}
 
@@ -151,7 +458,7 @@ class SpreadsheetServer:
 
         ws = wb[old_sheet]
         ws.title = sanitized_name
-        wb.save(path)
+        await self._save(wb, path)
 
         return {
             "success": True,
@@ -163,47 +470,68 @@ class SpreadsheetServer:
     # ---------------------- read / write / formula ----------------------
     async def read_spreadsheet(self, filename: str, sheet: Optional[str] = None,
                                max_rows: Optional[int] = None) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
+        path = self._resolve_path(filename)
         ext = path.suffix.lower()
 
         if ext == ".xlsx":
-            wb = openpyxl.load_workbook(path, data_only=False)
-            ws = wb[sheet] if sheet else wb.active
-            data = []
-            for i, row in enumerate(ws.iter_rows(values_only=False)):
-                if max_rows and i >= max_rows:
-                    break
-                # Serialize each cell value to handle datetime, etc.
-                data.append([serialize_cell_value(c.value) for c in row])
-            return {
-                "success": True,
-                "data": data,
-                "sheet_name": ws.title,
-                "rows": len(data),
-                "columns": len(data[0]) if data else 0
-            }
+            return await self._to_thread(path, self._read_xlsx, path, sheet, max_rows)
         elif ext == ".csv":
-            with open(path, 'r', encoding='utf-8') as f:
-                data = list(csv.reader(f))
-                if max_rows:
-                    data = data[:max_rows]
-            return {
-                "success": True,
-                "data": data,
-                "rows": len(data),
-                "columns": len(data[0]) if data else 0
-            }
+            return await self._to_thread(path, self._read_csv, path, max_rows)
         else:
             raise ValueError("Unsupported format")
 
+    @staticmethod
+    def _read_xlsx(path: Path, sheet: Optional[str], max_rows: Optional[int]) -> dict:
+        # Stream the sheet XML instead of building the whole workbook;
+        # data_only=False keeps formulas as written, like get_formula
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=False, keep_links=False)
+        try:
+            ws = wb[sheet] if sheet else wb.active
+            # read_only trusts the sheet's <dimension> tag, which other tools often leave
+            # stale or omit; ignore it and square the rows up ourselves below
+            ws.reset_dimensions()
+            # Serialize each cell value to handle datetime, etc.
+            data = [[serialize_cell_value(v) for v in row]
+                    for row in ws.iter_rows(values_only=True, max_row=max_rows or None)]
+            title = ws.title
+        finally:
+            wb.close()
+        width = max(map(len, data), default=0)
+        for row in data:
+            row.extend([None] * (width - len(row)))
+        return {
+            "success": True,
+            "data": data,
+            "sheet_name": title,
+            "rows": len(data),
+            "columns": len(data[0]) if data else 0
+        }
+
+    @staticmethod
+    def _read_csv(path: Path, max_rows: Optional[int]) -> dict:
+        data = None
+        if pacsv is not None and not max_rows and path.stat().st_size >= CSV_ARROW_MIN_SIZE:
+            data = _read_csv_arrow(path)
+        if data is None:
+            with open(path, 'r', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+                reader = csv.reader(f)
+                # Stop parsing once max_rows rows have been read
+                data = list(islice(reader, max_rows)) if max_rows else list(reader)
+        return {
+            "success": True,
+            "data": data,
+            "rows": len(data),
+            "columns": len(data[0]) if data else 0
+        }
+
     async def write_spreadsheet(self, filename: str, data: list,
                                 sheet: Optional[str] = None,
                                 append: bool = False) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
+        path = self._resolve_path(filename)
         ext = path.suffix.lower()
 
         if ext == ".xlsx":
-            wb = openpyxl.load_workbook(path)
+            wb = await self._load(path)
 
             # If sheet is specified, check if it exists, create if not
             if sheet:
@@ -215,93 +543,168 @@ class SpreadsheetServer:
                 ws = wb.active
 
             if not append:
-                ws.delete_rows(1, ws.max_row)
+                self._clear_cells(ws)
 
             for row in data:
                 ws.append(row)
-            wb.save(path)
+            await self._save(wb, path)
             return {"success": True, "rows_written": len(data), "sheet": ws.title}
 
         elif ext == ".csv":
-            mode = 'a' if append else 'w'
-            with open(path, mode, newline='', encoding='utf-8') as f:
-                csv.writer(f).writerows(data)
+            await self._to_thread(path, self._write_csv_rows, path, data, append)
             return {"success": True, "rows_written": len(data)}
         else:
             raise ValueError("Unsupported format")
 
+    async def write_many(self, jobs: List[dict]) -> dict:
+        """
+        Run several write_spreadsheet jobs ({"filename", "data", "sheet"?, "append"?})
+        concurrently. Jobs on different files load and save on separate worker threads;
+        jobs on the same file wait for each other and run in the order given.
+        """
+        async def run(index: int, job) -> dict:
+            error = self._write_job_error(job)
+            if error:
+                return {"success": False, "error": f"Job {index}: {error}"}
+            async with self.lock_files(job["filename"]):
+                return await self.write_spreadsheet(**job)
+
+        outcomes = await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs)),
+                                        return_exceptions=True)
+        results = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = {"success": False, "error": str(outcome)}
+            elif isinstance(outcome, BaseException):
+                # Cancellation and the like end the whole call, not one job
+                raise outcome
+            filename = job.get("filename") if isinstance(job, dict) else None
+            results.append({"filename": filename, **outcome})
+        return {"success": all(r["success"] for r in results), "results": results}
+
+    @staticmethod
+    def _write_job_error(job) -> Optional[str]:
+        """Why a write_many job can't be run, or None if it is well-formed"""
+        if not isinstance(job, dict):
+            return "must be an object"
+        if not isinstance(job.get("filename"), str):
+            return "missing filename"
+        if not isinstance(job.get("data"), list):
+            return "missing data"
+        return None
+
+    @staticmethod
+    def _write_csv_rows(path: Path, rows: list, append: bool) -> None:
+        # r+ fails on a missing file instead of creating it, so no exists() check is needed
+        with open(path, 'r+', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+            if append:
+                f.seek(0, os.SEEK_END)
+            else:
+                f.truncate()
+            csv.writer(f).writerows(rows)
+
     async def append_row(self, filename: str, row_data: list,
                         sheet: Optional[str] = None) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
+        path = self._resolve_path(filename)
         ext = path.suffix.lower()
 
         if ext == ".xlsx":
-            wb = openpyxl.load_workbook(path)
+            wb = await self._load(path)
             ws = wb[sheet] if sheet else wb.active
             ws.append(row_data)
-            wb.save(path)
+            await self._save(wb, path)
             return {"success": True, "row_number": ws.max_row}
         elif ext == ".csv":
-            with open(path, 'a', newline='', encoding='utf-8') as f:
-                csv.writer(f).writerow(row_data)
+            await self._to_thread(path, self._write_csv_rows, path, [row_data], True)
             return {"success": True}
         else:
             raise ValueError("Unsupported format")
 
+    async def append_rows(self, filename: str, rows: list,
+                          sheet: Optional[str] = None) -> dict:
+        """Append many rows with one load/save (xlsx) or one open (csv)"""
+        path = self._resolve_path(filename)
+        ext = path.suffix.lower()
+
+        if ext == ".xlsx":
+            wb = await self._load(path)
+            ws = wb[sheet] if sheet else wb.active
+            for row in rows:
+                ws.append(row)
+            await self._save(wb, path)
+            return {"success": True, "rows_appended": len(rows), "row_number": ws.max_row}
+        elif ext == ".csv":
+            await self._to_thread(path, self._write_csv_rows, path, rows, True)
+            return {"success": True, "rows_appended": len(rows)}
+        else:
+            raise ValueError("Unsupported format")
+
     async def set_formula(self, filename: str, sheet: str, cell: str, formula: str) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
+        return await self._edit_sheet(filename, sheet, self._do_set_formula, cell, formula)
+
+    def _do_set_formula(self, ws, cell: str, formula: str) -> dict:
         ws[cell] = formula
-        wb.save(path)
         return {"success": True, "cell": cell, "formula": formula}
 
     async def get_formula(self, filename: str, sheet: str, cell: str) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path, data_only=False)
+        path = self._resolve_path(filename)
+        wb = await self._load(path, checkout=False)
         ws = wb[sheet]
-        val = ws[cell].value
+        # ws[cell] would create a missing cell in the cached workbook, which the next edit saves.
+        # Reading openpyxl's private _cells store instead is deliberate;
+        # test_get_formula_does_not_create_cells guards it
+        try:
+            key = coordinate_to_tuple(cell.replace("$", ""))
+        except ValueError:
+            raise ValueError(f"Invalid cell coordinate: {cell}") from None
+        found = ws._cells.get(key)
+        val = found.value if found is not None else None
         return {"success": True, "cell": cell, "formula_or_value": val}
 
     async def update_cell(self, filename: str, sheet: str, cell: str, value) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet] if sheet else wb.active
+        return await self._edit_sheet(filename, sheet, self._do_update_cell, cell, value)
+
+    def _do_update_cell(self, ws, cell: str, value) -> dict:
         ws[cell] = value
-        wb.save(path)
         return {"success": True, "cell": cell, "value": value}
 
     async def delete_spreadsheet(self, filename: str) -> dict:
         path = self._resolve_path(filename, check_exists=True)
         path.unlink()
+        self._forget_workbook(path)
         return {"success": True, "filename": filename}
 
     async def set_column_format(self, filename: str, sheet: str, column: str,
                                 width: Optional[float] = None) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
+        if not width:
+            # Nothing to change: skip the load and the full save, but still reject a bad path
+            self._resolve_path(filename, check_exists=True)
+            return {"success": True, "column": column, "noop": True}
+        return await self._edit_sheet(filename, sheet, self._do_set_column_format, column, width)
+
+    def _do_set_column_format(self, ws, column: str, width: Optional[float] = None) -> dict:
         if width:
             ws.column_dimensions[column].width = width
-        wb.save(path)
         return {"success": True, "column": column}
 
     async def set_row_format(self, filename: str, sheet: str, row: int,
                              height: Optional[float] = None) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
+        if not height:
+            self._resolve_path(filename, check_exists=True)
+            return {"success": True, "row": row, "noop": True}
+        return await self._edit_sheet(filename, sheet, self._do_set_row_format, row, height)
+
+    def _do_set_row_format(self, ws, row: int, height: Optional[float] = None) -> dict:
         if height:
             ws.row_dimensions[row].height = height
-        wb.save(path)
         return {"success": True, "row": row}
 
     async def create_chart(self, filename: str, sheet: str, chart_type: str,
                            data_range: str, title: str = "Chart") -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
+        return await self._edit_sheet(filename, sheet, self._do_create_chart,
+                                      chart_type, data_range, title)
 
+    def _do_create_chart(self, ws, chart_type: str, data_range: str, title: str = "Chart") -> dict:
         if chart_type == "bar":
             chart = BarChart()
         elif chart_type == "pie":
@@ -314,7 +717,7 @@ class SpreadsheetServer:
         # Format the range with sheet name if not already included
         if '!' not in data_range:
             # Add sheet name to range
-            formatted_range = f"'{sheet}'!{data_range}"
+            formatted_range = f"'{ws.title}'!{data_range}"
         else:
             formatted_range = data_range
 
@@ -324,86 +727,91 @@ class SpreadsheetServer:
         # Position the chart - you might want to make this configurable
         ws.add_chart(chart, "D2")  # Places chart starting at cell D2
 
-        wb.save(path)
         return {"success": True, "chart_type": chart_type, "title": title}
 
+    @staticmethod
+    def _range_cells(ws, cell_range: str) -> list:
+        """Cells of a single cell (B3), range (A1:B10), column range (B:B) or row range (1:1)"""
+        result = ws[cell_range]
+        if hasattr(result, 'value'):
+            # Single cell
+            return [result]
+        cells = []
+        for item in result:
+            if isinstance(item, tuple):
+                cells.extend(item)
+            else:
+                cells.append(item)
+        return cells
 
-    def _normalize_color(self, color: Optional[str]) -> Optional[str]:
-        """Convert RGB hex color to ARGB format for openpyxl"""
-        if not color:
-            return None
-
-        # Remove # if present
-        color = color.lstrip('#')
-
-        # If it's 6 characters (RGB), prepend FF for full opacity
-        if len(color) == 6:
-            return 'FF' + color.upper()
-        # If it's already 8 characters (ARGB), use as-is
-        elif len(color) == 8:
-            return color.upper()
-        else:
-            raise ValueError(f"Invalid color format: {color}. Use #RRGGBB or AARRGGBB")
+    @staticmethod
+    def _range_dimensions(ws, cell_range: str) -> list:
+        """
+        Column dimensions of a column range (B:D) or row dimensions of a row range (2:4),
+        otherwise []. Styling them also covers cells past the used area.
+        """
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        if min_row is None:
+            return [ws.column_dimensions[get_column_letter(c)] for c in range(min_col, max_col + 1)]
+        if min_col is None:
+            return [ws.row_dimensions[r] for r in range(min_row, max_row + 1)]
+        return []
 
     async def format_cells(self, filename: str, sheet: str, cell_range: str,
                            bold: bool = False, italic: bool = False,
                            bg_color: Optional[str] = None,
                            font_size: Optional[int] = None) -> dict:
         """Format a range of cells like A1:B10, entire columns like B:B, or entire rows like 1:1"""
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
-
+        if not (bold or italic or font_size or bg_color):
+            self._resolve_path(filename, check_exists=True)
+            return {"success": True, "range": cell_range, "cells_formatted": 0, "noop": True}
+        return await self._edit_sheet(filename, sheet, self._do_format_cells, cell_range,
+                                      bold, italic, bg_color, font_size)
+
+    def _do_format_cells(self, ws, cell_range: str, bold: bool = False, italic: bool = False,
+                         bg_color: Optional[str] = None,
+                         font_size: Optional[int] = None) -> dict:
         # Normalize color to ARGB
-        normalized_color = self._normalize_color(bg_color)
-
-        # Get all cells in the range
-        cells_to_format = []
+        normalized_color = _normalize_color(bg_color)
 
         try:
-            result = ws[cell_range]
-
-            # Check if it's a single cell
-            if hasattr(result, 'value'):
-                # Single cell
-                cells_to_format.append(result)
-            else:
-                # Range of cells
-                for item in result:
-                    if isinstance(item, tuple):
-                        cells_to_format.extend(item)
-                    else:
-                        cells_to_format.append(item)
+            cells_to_format = self._range_cells(ws, cell_range)
+            dimensions = self._range_dimensions(ws, cell_range)
         except Exception as e:
             return {"success": False, "error": f"Invalid cell range: {str(e)}"}
 
-        # Apply formatting to all cells
-        for cell in cells_to_format:
-            if bold or italic or font_size:
-                cell.font = Font(bold=bold, italic=italic, size=font_size)
-            if normalized_color:
-                cell.fill = PatternFill(start_color=normalized_color, fill_type="solid")
+        # One shared Font/Fill for the whole range; openpyxl stores each style once anyway
+        font = _font(bool(bold), bool(italic), font_size) if bold or italic or font_size else None
+        fill = _solid_fill(normalized_color) if normalized_color else None
+        for target in chain(dimensions, cells_to_format):
+            if font:
+                target.font = font
+            if fill:
+                target.fill = fill
 
-        wb.save(path)
         return {"success": True, "range": cell_range, "cells_formatted": len(cells_to_format)}
 
     async def set_cell_format(self, filename: str, sheet: str, cell: str,
                               bold: bool = False, italic: bool = False,
                               bg_color: Optional[str] = None) -> dict:
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
+        if not (bold or italic or bg_color):
+            self._resolve_path(filename, check_exists=True)
+            return {"success": True, "cell": cell, "noop": True}
+        return await self._edit_sheet(filename, sheet, self._do_set_cell_format, cell,
+                                      bold, italic, bg_color)
+
+    def _do_set_cell_format(self, ws, cell: str, bold: bool = False, italic: bool = False,
+                            bg_color: Optional[str] = None) -> dict:
         target = ws[cell]
 
         if bold or italic:
-            target.font = Font(bold=bold, italic=italic)
+            target.font = _font(bool(bold), bool(italic))
 
         # Normalize color to ARGB
-        normalized_color = self._normalize_color(bg_color)
+        normalized_color = _normalize_color(bg_color)
         if normalized_color:
-            target.fill = PatternFill(start_color=normalized_color, fill_type="solid")
+            target.fill = _solid_fill(normalized_color)
 
-        wb.save(path)
         return {"success": True, "cell": cell}
 
     async def freeze_panes(self, filename: str, sheet: str, cell: str) -> dict:
@@ -414,38 +822,26 @@ class SpreadsheetServer:
         - 'B1' freezes the first column
         - 'B2' freezes both the top row and first column
         """
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-
-        if sheet not in wb.sheetnames:
-            return {"success": False, "error": f"Sheet {sheet} not found"}
+        return await self._edit_sheet(filename, sheet, self._do_freeze_panes, cell)
 
-        ws = wb[sheet]
+    def _do_freeze_panes(self, ws, cell: str) -> dict:
         ws.freeze_panes = cell
-        wb.save(path)
-
         return {
             "success": True,
-            "sheet": sheet,
+            "sheet": ws.title,
             "freeze_cell": cell,
             "message": f"Frozen panes at {cell}"
         }
 
     async def unfreeze_panes(self, filename: str, sheet: str) -> dict:
         """Remove frozen panes from a sheet"""
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
+        return await self._edit_sheet(filename, sheet, self._do_unfreeze_panes)
 
-        if sheet not in wb.sheetnames:
-            return {"success": False, "error": f"Sheet {sheet} not found"}
-
-        ws = wb[sheet]
+    def _do_unfreeze_panes(self, ws) -> dict:
         ws.freeze_panes = None
-        wb.save(path)
-
         return {
             "success": True,
-            "sheet": sheet,
+            "sheet": ws.title,
             "message": "Unfrozen panes"
         }
 
@@ -455,35 +851,20 @@ class SpreadsheetServer:
         Enable or disable text wrapping for a range of cells.
         Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)
         """
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
-
-        # Get all cells in the range
-        cells_to_format = []
+        return await self._edit_sheet(filename, sheet, self._do_set_text_wrap, cell_range, wrap)
 
+    def _do_set_text_wrap(self, ws, cell_range: str, wrap: bool = True) -> dict:
         try:
-            result = ws[cell_range]
-
-            # Check if it's a single cell
-            if hasattr(result, 'value'):
-                # Single cell
-                cells_to_format.append(result)
-            else:
-                # Range of cells
-                for item in result:
-                    if isinstance(item, tuple):
-                        cells_to_format.extend(item)
-                    else:
-                        cells_to_format.append(item)
+            cells_to_format = self._range_cells(ws, cell_range)
+            dimensions = self._range_dimensions(ws, cell_range)
         except Exception as e:
             return {"success": False, "error": f"Invalid cell range: {str(e)}"}
 
         # Apply text wrapping to all cells
-        for cell in cells_to_format:
-            cell.alignment = Alignment(wrap_text=wrap)
+        alignment = Alignment(wrap_text=wrap)
+        for target in chain(dimensions, cells_to_format):
+            target.alignment = alignment
 
-        wb.save(path)
         return {
             "success": True,
             "range": cell_range,
@@ -502,27 +883,15 @@ class SpreadsheetServer:
         vertical: 'top', 'center', 'bottom', 'justify'
         wrap_text: True/False
         """
-        path = self._resolve_path(filename, check_exists=True)
-        wb = openpyxl.load_workbook(path)
-        ws = wb[sheet]
-
-        # Get all cells in the range
-        cells_to_format = []
+        return await self._edit_sheet(filename, sheet, self._do_set_cell_alignment, cell_range,
+                                      horizontal, vertical, wrap_text)
 
+    def _do_set_cell_alignment(self, ws, cell_range: str, horizontal: Optional[str] = None,
+                               vertical: Optional[str] = None,
+                               wrap_text: Optional[bool] = None) -> dict:
         try:
-            result = ws[cell_range]
-
-            # Check if it's a single cell
-            if hasattr(result, 'value'):
-                # Single cell
-                cells_to_format.append(result)
-            else:
-                # Range of cells
-                for item in result:
-                    if isinstance(item, tuple):
-                        cells_to_format.extend(item)
-                    else:
-                        cells_to_format.append(item)
+            cells_to_format = self._range_cells(ws, cell_range)
+            dimensions = self._range_dimensions(ws, cell_range)
         except Exception as e:
             return {"success": False, "error": f"Invalid cell range: {str(e)}"}
 
@@ -536,20 +905,139 @@ class SpreadsheetServer:
             align_params['wrap_text'] = wrap_text
 
         # Apply alignment to all cells
-        for cell in cells_to_format:
-            cell.alignment = Alignment(**align_params)
+        alignment = Alignment(**align_params)
+        for target in chain(dimensions, cells_to_format):
+            target.alignment = alignment
 
-        wb.save(path)
         return {
             "success": True,
             "range": cell_range,
             "alignment": align_params,
             "cells_affected": len(cells_to_format)
         }
+
+    # ---------------------- batched edits ----------------------
+    def _sheet_or_error(self, wb, sheet: Optional[str]):
+        """Return (worksheet, None), or (None, error result) when the sheet is missing"""
+        if not sheet:
+            return wb.active, None
+        if sheet not in wb.sheetnames:
+            return None, {"success": False, "error": f"Sheet {sheet} not found"}
+        return wb[sheet], None
+
+    async def _edit_sheet(self, filename: str, sheet: Optional[str], do, *args) -> dict:
+        """Load the workbook, apply one _do_* edit to the sheet and save if it succeeded"""
+        path = self._resolve_path(filename)
+        wb = await self._load(path)
+        ws, error = self._sheet_or_error(wb, sheet)
+        if error:
+            return error
+        result = do(ws, *args)
+        if result["success"]:
+            await self._save(wb, path)
+        return result
+
+    async def apply_ops(self, filename: str, ops: List[dict]) -> dict:
+        """
+        Apply several edits to one workbook with a single load and a single save.
+        Each op is {"op": <one of BATCH_OPS>, "sheet": ..., **that tool's arguments}.
+        The batch is all-or-nothing: nothing is saved if any op fails.
+        """
+        # Anything but {"op": <batch op>, ...} is reported as it was given
+        unknown = [op.get("op") if isinstance(op, dict) else op for op in ops
+                   if not isinstance(op, dict) or op.get("op") not in BATCH_OPS]
+        if unknown:
+            raise ValueError(f"Unsupported batch op(s): {', '.join(map(str, unknown))}. "
+                             f"Use one of {', '.join(BATCH_OPS)}")
+
+        if not ops:
+            # Nothing to apply: skip the load and the full save, but still reject a bad path
+            self._resolve_path(filename, check_exists=True)
+            return {"success": True, "ops_applied": 0, "results": []}
+
+        path = self._resolve_path(filename)
+        wb = await self._load(path)
+        results = []
+        for index, op in enumerate(ops):
+            params = {k: v for k, v in op.items() if k not in ("op", "sheet")}
+            ws, result = self._sheet_or_error(wb, op.get("sheet"))
+            if ws is not None:
+                result = getattr(self, f"_do_{op['op']}")(ws, **params)
+            results.append(result)
+            if not result["success"]:
+                return {"success": False, "failed_op": index, "error": result["error"],
+                        "results": results}
+
+        await self._save(wb, path)
+        return {"success": True, "ops_applied": len(results), "results": results}
     # ---------------------- JSON-RPC / MCP glue ----------------------
 
+def write_line(payload: bytes):
+    out = sys.stdout.buffer
+    out.write(payload + b"\n")
+    out.flush()
+
+
+def json_string(payload: bytes) -> bytes:
+    """
+    Encode json_dumps output as a JSON string literal. json_dumps already escapes
+    control characters, so only quotes and backslashes are left to escape.
+    """
+    return b'"' + payload.replace(b'\\', b'\\\\').replace(b'"', b'\\"') + b'"'
+
+
 def send_response(response: dict):
-    print(json.dumps(response), flush=True)
+    write_line(json_dumps(response))
+
+
+async def _skip_line(reader: asyncio.StreamReader) -> None:
+    """Drop the rest of a line longer than the reader's limit, up to and including its newline"""
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as e:
+            # consumed bytes are still buffered and hold no newline (or end right before it)
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+async def _stream_lines(reader: asyncio.StreamReader):
+    """Yield the lines of reader, or None in place of each line longer than its limit"""
+    while True:
+        try:
+            yield await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # EOF: the last line may lack its newline
+            if e.partial:
+                yield e.partial
+            return
+        except asyncio.LimitOverrunError:
+            await _skip_line(reader)
+            yield None
+
+
+async def read_lines():
+    """
+    Yield raw request lines from stdin. Pipes are read by the event loop itself;
+    ttys and platforms without pipe support fall back to a readline thread.
+    A piped line longer than STDIN_LIMIT is skipped and yielded as None.
+    """
+    loop = asyncio.get_running_loop()
+    if not sys.stdin.isatty():
+        reader = asyncio.StreamReader(limit=STDIN_LIMIT)
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        except (ValueError, OSError, NotImplementedError):
+            reader = None
+        if reader is not None:
+            async for line in _stream_lines(reader):
+                yield line
+            return
+
+    while line := await loop.run_in_executor(None, sys.stdin.buffer.readline):
+        yield line
 
 
 async def handle_initialize(request_id):
@@ -567,298 +1055,364 @@ async def handle_initialize(request_id):
     })
 
 
-async def handle_tools_list(request_id):
-    send_response({
-        "jsonrpc": "2.0",
-        "id": request_id,
-        "result": {
-            "tools": [
-                {
-                    "name": "list_files",
-                    "description": "List all spreadsheet files in the base directory",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "pattern": {
-                                "type": "string",
-                                "description": "Glob pattern to filter files (default: '*')",
-                                "default": "*"
-                            }
-                        }
+# tools/list never changes, so its result is serialized once at import
+_TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "list_files",
+            "description": "List all spreadsheet files in the base directory",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Glob pattern to filter files (default: '*')",
+                        "default": "*"
                     }
+                }
+            }
+        },
+        {
+            "name": "create_spreadsheet",
+            "description": "Create a new spreadsheet file",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "format": {"type": "string", "description": "File format (xlsx or csv)", "default": "xlsx"},
+                    "headers": {"type": "array", "items": {"type": "string"}, "description": "Optional header row"},
+                    "sheet_name": {"type": "string", "description": "Name of the first sheet", "default": "Sheet1"}
                 },
-                {
-                    "name": "create_spreadsheet",
-                    "description": "Create a new spreadsheet file",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "format": {"type": "string", "description": "File format (xlsx or csv)", "default": "xlsx"},
-                            "headers": {"type": "array", "items": {"type": "string"}, "description": "Optional header row"},
-                            "sheet_name": {"type": "string", "description": "Name of the first sheet", "default": "Sheet1"}
-                        },
-                        "required": ["filename"]
-                    }
+                "required": ["filename"]
+            }
+        },
+        {
+            "name": "read_spreadsheet",
+            "description": "Read data from a spreadsheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name (optional)"},
+                    "max_rows": {"type": "integer", "description": "Maximum rows to read"}
                 },
-                {
-                    "name": "read_spreadsheet",
-                    "description": "Read data from a spreadsheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name (optional)"},
-                            "max_rows": {"type": "integer", "description": "Maximum rows to read"}
-                        },
-                        "required": ["filename"]
-                    }
+                "required": ["filename"]
+            }
+        },
+        {
+            "name": "write_spreadsheet",
+            "description": "Write data to a spreadsheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "data": {"type": "array", "description": "2D array of data"},
+                    "sheet": {"type": "string", "description": "Sheet name (optional)"},
+                    "append": {"type": "boolean", "description": "Append instead of overwrite", "default": False}
                 },
-                {
-                    "name": "write_spreadsheet",
-                    "description": "Write data to a spreadsheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "data": {"type": "array", "description": "2D array of data"},
-                            "sheet": {"type": "string", "description": "Sheet name (optional)"},
-                            "append": {"type": "boolean", "description": "Append instead of overwrite", "default": False}
-                        },
-                        "required": ["filename", "data"]
+                "required": ["filename", "data"]
+            }
+        },
+        {
+            "name": "write_many",
+            "description": "Write data to several spreadsheets at once (same options as write_spreadsheet per job)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "jobs": {
+                        "type": "array",
+                        "description": "Write jobs, run concurrently across files and in order within a file",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "filename": {"type": "string", "description": "Name of the file"},
+                                "data": {"type": "array", "description": "2D array of data"},
+                                "sheet": {"type": "string", "description": "Sheet name (optional)"},
+                                "append": {"type": "boolean", "description": "Append instead of overwrite", "default": False}
+                            },
+                            "required": ["filename", "data"]
+                        }
                     }
                 },
-                {
-                    "name": "append_row",
-                    "description": "Append a single row to a spreadsheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "row_data": {"type": "array", "description": "Row data as array"},
-                            "sheet": {"type": "string", "description": "Sheet name (optional)"}
-                        },
-                        "required": ["filename", "row_data"]
-                    }
+                "required": ["jobs"]
+            }
+        },
+        {
+            "name": "append_row",
+            "description": "Append a single row to a spreadsheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "row_data": {"type": "array", "description": "Row data as array"},
+                    "sheet": {"type": "string", "description": "Sheet name (optional)"}
                 },
-                {
-                    "name": "update_cell",
-                    "description": "Update a single cell value",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell": {"type": "string", "description": "Cell reference (e.g., 'A1')"},
-                            "value": {"description": "Value to set"}
-                        },
-                        "required": ["filename", "sheet", "cell", "value"]
-                    }
+                "required": ["filename", "row_data"]
+            }
+        },
+        {
+            "name": "append_rows",
+            "description": "Append several rows to a spreadsheet in one write",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "rows": {"type": "array", "items": {"type": "array"}, "description": "Rows to append"},
+                    "sheet": {"type": "string", "description": "Sheet name (optional)"}
                 },
-                {
-                    "name": "delete_spreadsheet",
-                    "description": "Delete a spreadsheet file",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"}
-                        },
-                        "required": ["filename"]
-                    }
+                "required": ["filename", "rows"]
+            }
+        },
+        {
+            "name": "update_cell",
+            "description": "Update a single cell value",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell": {"type": "string", "description": "Cell reference (e.g., 'A1')"},
+                    "value": {"description": "Value to set"}
                 },
-                {
-                    "name": "format_cells",
-                    "description": "Format cells. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell_range": {"type": "string", "description": "Cell range (e.g., 'A1:B10')"},
-                            "bold": {"type": "boolean", "default": False},
-                            "italic": {"type": "boolean", "default": False},
-                            "bg_color": {"type": "string", "description": "Background color hex (e.g., '#00FF00' or 'FF00FF00')"},
-                            "font_size": {"type": "integer", "description": "Font size"}
-                        },
-                        "required": ["filename", "sheet", "cell_range"]
-                    }
+                "required": ["filename", "sheet", "cell", "value"]
+            }
+        },
+        {
+            "name": "delete_spreadsheet",
+            "description": "Delete a spreadsheet file",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"}
                 },
-                {
-                    "name": "set_formula",
-                    "description": "Set a formula in a cell",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell": {"type": "string", "description": "Cell reference"},
-                            "formula": {"type": "string", "description": "Excel formula"}
-                        },
-                        "required": ["filename", "sheet", "cell", "formula"]
-                    }
+                "required": ["filename"]
+            }
+        },
+        {
+            "name": "format_cells",
+            "description": "Format cells. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell_range": {"type": "string", "description": "Cell range (e.g., 'A1:B10')"},
+                    "bold": {"type": "boolean", "default": False},
+                    "italic": {"type": "boolean", "default": False},
+                    "bg_color": {"type": "string", "description": "Background color hex (e.g., '#00FF00' or 'FF00FF00')"},
+                    "font_size": {"type": "integer", "description": "Font size"}
                 },
-                {
-                    "name": "get_formula",
-                    "description": "Get formula from a cell",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell": {"type": "string", "description": "Cell reference"}
-                        },
-                        "required": ["filename", "sheet", "cell"]
-                    }
+                "required": ["filename", "sheet", "cell_range"]
+            }
+        },
+        {
+            "name": "set_formula",
+            "description": "Set a formula in a cell",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell": {"type": "string", "description": "Cell reference"},
+                    "formula": {"type": "string", "description": "Excel formula"}
                 },
-                {
-                    "name": "rename_sheet",
-                    "description": "Rename a sheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "old_sheet": {"type": "string", "description": "Current sheet name"},
-                            "new_sheet": {"type": "string", "description": "New sheet name"}
-                        },
-                        "required": ["filename", "old_sheet", "new_sheet"]
-                    }
+                "required": ["filename", "sheet", "cell", "formula"]
+            }
+        },
+        {
+            "name": "get_formula",
+            "description": "Get formula from a cell",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell": {"type": "string", "description": "Cell reference"}
                 },
-                {
-                    "name": "rename_file",
-                    "description": "Rename a file",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "old_filename": {"type": "string", "description": "Current filename"},
-                            "new_filename": {"type": "string", "description": "New filename"}
-                        },
-                        "required": ["old_filename", "new_filename"]
-                    }
+                "required": ["filename", "sheet", "cell"]
+            }
+        },
+        {
+            "name": "rename_sheet",
+            "description": "Rename a sheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "old_sheet": {"type": "string", "description": "Current sheet name"},
+                    "new_sheet": {"type": "string", "description": "New sheet name"}
                 },
-                {
-                    "name": "set_cell_format",
-                    "description": "Format a single cell",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell": {"type": "string", "description": "Cell reference"},
-                            "bold": {"type": "boolean", "default": False},
-                            "italic": {"type": "boolean", "default": False},
-                            "bg_color": {"type": "string", "description": "Background color hex (e.g., '#00FF00' or 'FF00FF00')"}
-                        },
-                        "required": ["filename", "sheet", "cell"]
-                    }
+                "required": ["filename", "old_sheet", "new_sheet"]
+            }
+        },
+        {
+            "name": "rename_file",
+            "description": "Rename a file",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "old_filename": {"type": "string", "description": "Current filename"},
+                    "new_filename": {"type": "string", "description": "New filename"}
                 },
-                {
-                    "name": "set_column_format",
-                    "description": "Format a column",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "column": {"type": "string", "description": "Column letter (e.g., 'A')"},
-                            "width": {"type": "number", "description": "Column width"}
-                        },
-                        "required": ["filename", "sheet", "column"]
-                    }
+                "required": ["old_filename", "new_filename"]
+            }
+        },
+        {
+            "name": "set_cell_format",
+            "description": "Format a single cell",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell": {"type": "string", "description": "Cell reference"},
+                    "bold": {"type": "boolean", "default": False},
+                    "italic": {"type": "boolean", "default": False},
+                    "bg_color": {"type": "string", "description": "Background color hex (e.g., '#00FF00' or 'FF00FF00')"}
                 },
-                {
-                    "name": "set_row_format",
-                    "description": "Format a row",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "row": {"type": "integer", "description": "Row number"},
-                            "height": {"type": "number", "description": "Row height"}
-                        },
-                        "required": ["filename", "sheet", "row"]
-                    }
+                "required": ["filename", "sheet", "cell"]
+            }
+        },
+        {
+            "name": "set_column_format",
+            "description": "Format a column",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "column": {"type": "string", "description": "Column letter (e.g., 'A')"},
+                    "width": {"type": "number", "description": "Column width"}
                 },
-                {
-                    "name": "create_chart",
-                    "description": "Create a chart in the spreadsheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "chart_type": {"type": "string", "description": "Chart type (bar or pie)"},
-                            "data_range": {"type": "string", "description": "Data range (e.g., 'A1:B10')"},
-                            "title": {"type": "string", "description": "Chart title", "default": "Chart"}
-                        },
-                        "required": ["filename", "sheet", "chart_type", "data_range"]
-                    }
+                "required": ["filename", "sheet", "column"]
+            }
+        },
+        {
+            "name": "set_row_format",
+            "description": "Format a row",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "row": {"type": "integer", "description": "Row number"},
+                    "height": {"type": "number", "description": "Row height"}
                 },
-                {
-                    "name": "freeze_panes",
-                    "description": "Freeze rows and/or columns at a specific cell position. Use 'A2' to freeze top row, 'B1' to freeze first column, 'B2' to freeze both.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell": {"type": "string", "description": "Cell reference where to freeze (e.g., 'A2' for top row, 'B1' for first column, 'B2' for both)"}
-                        },
-                        "required": ["filename", "sheet", "cell"]
-                    }
+                "required": ["filename", "sheet", "row"]
+            }
+        },
+        {
+            "name": "create_chart",
+            "description": "Create a chart in the spreadsheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "chart_type": {"type": "string", "description": "Chart type (bar or pie)"},
+                    "data_range": {"type": "string", "description": "Data range (e.g., 'A1:B10')"},
+                    "title": {"type": "string", "description": "Chart title", "default": "Chart"}
                 },
-                {
-                    "name": "unfreeze_panes",
-                    "description": "Remove frozen panes from a sheet",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"}
-                        },
-                        "required": ["filename", "sheet"]
-                    }
+                "required": ["filename", "sheet", "chart_type", "data_range"]
+            }
+        },
+        {
+            "name": "freeze_panes",
+            "description": "Freeze rows and/or columns at a specific cell position. Use 'A2' to freeze top row, 'B1' to freeze first column, 'B2' to freeze both.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell": {"type": "string", "description": "Cell reference where to freeze (e.g., 'A2' for top row, 'B1' for first column, 'B2' for both)"}
                 },
-                {
-                    "name": "set_cell_alignment",
-                    "description": "Set cell alignment. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell_range": {"type": "string",
-                                           "description": "Cell range (e.g., 'A1:B10'), column (e.g., 'B:B'), or row (e.g., '1:1')"},
-                            "horizontal": {"type": "string",
-                                           "description": "Horizontal alignment: 'left', 'center', 'right', 'justify'",
-                                           "enum": ["left", "center", "right", "justify"]},
-                            "vertical": {"type": "string",
-                                         "description": "Vertical alignment: 'top', 'center', 'bottom', 'justify'",
-                                         "enum": ["top", "center", "bottom", "justify"]},
-                            "wrap_text": {"type": "boolean", "description": "Enable text wrapping"}
-                        },
-                        "required": ["filename", "sheet", "cell_range"]
-                    }
+                "required": ["filename", "sheet", "cell"]
+            }
+        },
+        {
+            "name": "unfreeze_panes",
+            "description": "Remove frozen panes from a sheet",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"}
                 },
-                {
-                    "name": "set_text_wrap",
-                    "description": "Enable or disable text wrapping. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {"type": "string", "description": "Name of the file"},
-                            "sheet": {"type": "string", "description": "Sheet name"},
-                            "cell_range": {"type": "string",
-                                           "description": "Cell range (e.g., 'A1:B10'), column range (e.g., 'B:B'), or row range (e.g., '1:1')"},
-                            "wrap": {"type": "boolean", "description": "Enable (true) or disable (false) text wrapping",
-                                     "default": True}
-                        },
-                        "required": ["filename", "sheet", "cell_range"]
+                "required": ["filename", "sheet"]
+            }
+        },
+        {
+            "name": "set_cell_alignment",
+            "description": "Set cell alignment. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell_range": {"type": "string",
+                                   "description": "Cell range (e.g., 'A1:B10'), column (e.g., 'B:B'), or row (e.g., '1:1')"},
+                    "horizontal": {"type": "string",
+                                   "description": "Horizontal alignment: 'left', 'center', 'right', 'justify'",
+                                   "enum": ["left", "center", "right", "justify"]},
+                    "vertical": {"type": "string",
+                                 "description": "Vertical alignment: 'top', 'center', 'bottom', 'justify'",
+                                 "enum": ["top", "center", "bottom", "justify"]},
+                    "wrap_text": {"type": "boolean", "description": "Enable text wrapping"}
+                },
+                "required": ["filename", "sheet", "cell_range"]
+            }
+        },
+        {
+            "name": "apply_ops",
+            "description": "Apply several cell/format edits to one workbook with a single load and save. "
+                           "All-or-nothing: nothing is saved if any op fails.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "ops": {
+                        "type": "array",
+                        "description": "Edits to apply in order. Each item is an object with 'op' (the tool name), "
+                                       "'sheet', and the remaining arguments of that tool, e.g. "
+                                       "{'op': 'update_cell', 'sheet': 'Q1', 'cell': 'A1', 'value': 5}",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {"type": "string", "enum": list(BATCH_OPS)},
+                                "sheet": {"type": "string", "description": "Sheet name"}
+                            },
+                            "required": ["op"]
+                        }
                     }
-                }
-            ]
+                },
+                "required": ["filename", "ops"]
+            }
+        },
+        {
+            "name": "set_text_wrap",
+            "description": "Enable or disable text wrapping. Supports single cells (B3), ranges (A1:B10), columns (B:B), or rows (1:1)",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Name of the file"},
+                    "sheet": {"type": "string", "description": "Sheet name"},
+                    "cell_range": {"type": "string",
+                                   "description": "Cell range (e.g., 'A1:B10'), column range (e.g., 'B:B'), or row range (e.g., '1:1')"},
+                    "wrap": {"type": "boolean", "description": "Enable (true) or disable (false) text wrapping",
+                             "default": True}
+                },
+                "required": ["filename", "sheet", "cell_range"]
+            }
         }
-    })
+    ]
+}
+_TOOLS_LIST_RESULT_JSON = json_dumps(_TOOLS_LIST_RESULT)
+
+
+async def handle_tools_list(request_id):
+    # Encode the id too: JSON-RPC ids may be strings
+    write_line(b'{"jsonrpc":"2.0","id":' + json_dumps(request_id) +
+               b',"result":' + _TOOLS_LIST_RESULT_JSON + b'}')
 
 
 async def handle_tool_call(request_id, server: SpreadsheetServer, tool_name: str, arguments: dict):
@@ -867,12 +1421,18 @@ async def handle_tool_call(request_id, server: SpreadsheetServer, tool_name: str
         if not method:
             raise ValueError(f"Unknown tool: {tool_name}")
 
-        result = await method(**(arguments or {}))
-        send_response({
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {"content": [{"type": "text", "text": json.dumps(result)}]}
-        })
+        arguments = arguments or {}
+        filenames = [arguments[k] for k in FILE_ARGUMENTS if isinstance(arguments.get(k), str)]
+        if tool_name == "create_spreadsheet" and filenames:
+            # Lock the file that will be written, not the bare name the client passed
+            filenames = [server._with_extension(filenames[0], str(arguments.get("format", "xlsx")))]
+        async with server.lock_files(*filenames):
+            result = await method(**arguments)
+        # The result travels as JSON text inside the envelope; splice it in as bytes
+        # rather than decoding it and running the whole envelope through the encoder again
+        write_line(b'{"jsonrpc":"2.0","id":' + json_dumps(request_id) +
+                   b',"result":{"content":[{"type":"text","text":' +
+                   json_string(json_dumps(result)) + b'}]}}')
 
     except Exception as e:
         logger.error(f"Error in tool {tool_name}: {e}", exc_info=True)
@@ -884,23 +1444,33 @@ async def handle_tool_call(request_id, server: SpreadsheetServer, tool_name: str
 
 
 async def main():
-    server = SpreadsheetServer()
+    server = SpreadsheetServer(backend=os.environ.get("SPREADSHEET_BACKEND", "openpyxl"))
     logger.info("Spreadsheet MCP Server starting (enhanced)...")
 
-    loop = asyncio.get_event_loop()
-
-    while True:
-        line = await loop.run_in_executor(None, sys.stdin.readline)
-
-        if not line:  # EOF = shutdown
-            logger.info("STDIN closed — shutting down.")
-            break
+    # Tool calls run as tasks so a slow save doesn't hold up the next request;
+    # per-file locks in handle_tool_call keep calls on one file in order
+    slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    tasks = set()
 
+    async def dispatch(request_id, tool_name, arguments):
+        try:
+            await handle_tool_call(request_id, server, tool_name, arguments)
+        finally:
+            slots.release()
+
+    async for line in read_lines():
+        if line is None:
+            send_response({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": f"Request exceeds {STDIN_LIMIT} bytes"}
+            })
+            continue
         line = line.strip()
         if not line:
             continue
 
-        request = json.loads(line)
+        request = json_loads(line)
         method = request.get("method")
         request_id = request.get("id")
 
@@ -911,7 +1481,14 @@ async def main():
         elif method == "tools/call":
             tool_name = request["params"]["name"]
             arguments = request["params"].get("arguments", {})
-            await handle_tool_call(request_id, server, tool_name, arguments)
+            await slots.acquire()
+            task = asyncio.create_task(dispatch(request_id, tool_name, arguments))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    # EOF = shutdown, once in-flight calls have answered
+    logger.info("STDIN closed — shutting down.")
+    await asyncio.gather(*tasks)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+from spreadsheet_server import SpreadsheetServer
+
+try:
+    import uvloop
+except ImportError:  # no Windows build; fall back to the default loop
+    uvloop = None
+
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Put tmp_path on tmpfs ($PYTEST_TMPFS, default /dev/shm) unless a temp root is already chosen"""
+    tmpfs = Path(os.environ.get("PYTEST_TMPFS", "/dev/shm"))
+    # Move the temp root rather than setting --basetemp: a given basetemp is wiped at
+    # every session start, whereas under the root pytest keeps its numbered, owner-checked
+    # pytest-of-<user>/pytest-N directories (xdist workers inherit the variable)
+    if tmpfs.is_dir():
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", str(tmpfs))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_openpyxl():
+    """Import the openpyxl submodules the tests hit once per worker, up front"""
+    import openpyxl.styles  # noqa: F401
+    import openpyxl.workbook  # noqa: F401
+    import openpyxl.writer.excel  # noqa: F401
+    from openpyxl.cell.cell import Cell  # noqa: F401
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    """One SpreadsheetServer per test module; it holds no per-test state"""
+    return SpreadsheetServer(base_path=str(tmp_path_factory.mktemp("spreadsheets")))
+
+
+class FakeSpreadsheetServer(SpreadsheetServer):
+    """Server whose xlsx writes are no-ops, for tests of the returned result only"""
+
+    def _write_xlsx(self, path, sheet_name, headers=None):
+        pass
+
+
+@pytest.fixture(scope="module")
+def fake_server(tmp_path_factory):
+    return FakeSpreadsheetServer(base_path=str(tmp_path_factory.mktemp("fake-spreadsheets")))
+
+
+@pytest.fixture
+def resolve_to(monkeypatch):
+    """
+    Make _resolve_path return a fixed path on every server for the rest of the test,
+    or, given a list, return its paths one per call
+    """
+    def _set(path_or_paths):
+        if isinstance(path_or_paths, (list, tuple)):
+            paths = iter(path_or_paths)
+
+            def _next(self, *args, **kwargs):
+                # A bare next() would raise StopIteration, which a coroutine turns into RuntimeError
+                path = next(paths, None)
+                assert path is not None, "_resolve_path called more often than resolve_to was given paths"
+                return path
+
+            monkeypatch.setattr(SpreadsheetServer, "_resolve_path", _next)
+        else:
+            monkeypatch.setattr(SpreadsheetServer, "_resolve_path", lambda self, *args, **kwargs: path_or_paths)
+    return _set
+
+
+@pytest.fixture
+def in_memory_saves(monkeypatch):
+    """Redirect workbook saves into BytesIO buffers keyed by target path"""
+    saved = {}
+
+    def _save(self, wb, path):
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        saved[path] = buf
+
+    def _write(self, path, data):
+        saved[path] = io.BytesIO(data)
+
+    monkeypatch.setattr(SpreadsheetServer, "_save_workbook", _save)
+    monkeypatch.setattr(SpreadsheetServer, "_write_bytes", _write)
+    return saved
+
+
+@pytest.fixture(scope="session")
+def _workbook_cache():
+    cache = {}
+    yield cache
+    for wb in cache.values():
+        wb.close()
+
+
+@pytest.fixture
+def load_wb(_workbook_cache):
+    """Load a workbook for assertions, reusing the parse while the file is unchanged.
+
+    Returned workbooks are shared between tests; do not mutate them.
+    """
+    def _load(path, read_only=True):
+        key = (os.fspath(path), os.stat(path).st_mtime_ns, read_only)
+        if key not in _workbook_cache:
+            _workbook_cache[key] = load_workbook(path, read_only=read_only, data_only=True)
+        return _workbook_cache[key]
+    return _load
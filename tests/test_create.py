@@ -0,0 +1,24 @@
+import os
+import pytest
+
+# Static part of each create_spreadsheet result; only "path" depends on tmp_path
+_XLSX_EXPECTED = {"success": True, "filename": "text.xlsx", "sheet_name": "Sheet1", "original_sheet_name": None}
+_CSV_EXPECTED = {"success": True, "filename": "text.csv"}
+
+
+@pytest.mark.parametrize("fmt,extra_kwargs,expected", [
+    ("xlsx", {"sheet_name": "Sheet1"}, _XLSX_EXPECTED),
+    ("xlsx", {"sheet_name": "Sales: Q1"},
+     {**_XLSX_EXPECTED, "sheet_name": "Sales Q1", "original_sheet_name": "Sales: Q1"}),
+    ("xlsx", {"sheet_name": "x" * 40},
+     {**_XLSX_EXPECTED, "sheet_name": "x" * 31, "original_sheet_name": "x" * 40}),
+    ("csv", {}, _CSV_EXPECTED),
+], ids=["xlsx", "xlsx-invalid-chars", "xlsx-too-long", "csv"])
+def test_create_spreadsheet(tmp_path, fake_server, resolve_to, fmt, extra_kwargs, expected):
+    filename = expected["filename"]
+    expected_path = tmp_path / filename
+    expected_result = {**expected, "path": os.fspath(expected_path)}
+    resolve_to(expected_path)
+    actual_result = fake_server.create_spreadsheet_sync(filename=filename, format=fmt, headers=None, **extra_kwargs)
+
+    assert actual_result == expected_result, f'Actual : {repr(actual_result)} is not matching the Expected: {repr(expected_result)}'
@@ -0,0 +1,51 @@
+import pytest
+from spreadsheet_server import SpreadsheetServer
+from unittest.mock import MagicMock
+
+
+class _PathStub:
+    """The slice of Path that rename_file touches; only rename needs call tracking"""
+
+    def __init__(self, name, exists):
+        self.name = name
+        self._exists = exists
+        self.rename = MagicMock()
+
+    def exists(self):
+        return self._exists
+
+
+@pytest.mark.asyncio
+async def test_rename_file(server, resolve_to):
+    current = "test.xlsx"
+    current_fake_path = _PathStub(current, True)
+    new = "test1.xlsx"
+    new_fake_path = _PathStub(new, False)
+
+    resolve_to([current_fake_path, new_fake_path])
+    result = await server.rename_file(old_filename=current, new_filename=new)
+
+    assert result == {"success": True, "old": current, "new": new}
+    current_fake_path.rename.assert_called_once_with(new_fake_path)
+
+
+@pytest.mark.parametrize("filename", ["../escape.xlsx", "../spreadsheets-other/escape.xlsx"])
+def test_resolve_path_rejects_traversal(tmp_path, filename):
+    spreadsheet = SpreadsheetServer(base_path=str(tmp_path / "spreadsheets"))
+    with pytest.raises(ValueError, match="Path traversal not allowed"):
+        spreadsheet._resolve_path(filename)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call", [
+    lambda s: s.read_spreadsheet("missing.csv"),
+    lambda s: s.read_spreadsheet("missing.xlsx"),
+    lambda s: s.write_spreadsheet("missing.csv", [[1]]),
+    lambda s: s.append_row("missing.csv", [1]),
+    lambda s: s.update_cell("missing.xlsx", "Sheet1", "A1", 1),
+    lambda s: s.get_formula("missing.xlsx", "Sheet1", "A1"),
+])
+async def test_missing_file_is_reported_without_creating_it(server, call):
+    with pytest.raises(FileNotFoundError, match="File not found: missing"):
+        await call(server)
+    assert not list(server.base_path.iterdir())
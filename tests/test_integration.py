@@ -0,0 +1,520 @@
+import asyncio
+import datetime
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Font
+from openpyxl.worksheet.datavalidation import DataValidation
+import spreadsheet_server
+from spreadsheet_server import SpreadsheetServer
+
+pytestmark = pytest.mark.slow
+
+
+def test_create_spreadsheet_excel_written(tmp_path, server, resolve_to, in_memory_saves):
+    expected_path = tmp_path / "text.xlsx"
+    resolve_to(expected_path)
+    server.create_spreadsheet_sync(filename="text.xlsx", format='xlsx', headers=None, sheet_name='Sales: Q1')
+
+    assert not expected_path.exists()
+    wb = load_workbook(in_memory_saves[expected_path], read_only=True, data_only=True)
+    assert wb.sheetnames == ['Sales Q1']
+    wb.close()
+
+
+def test_create_spreadsheet_excel_with_headers(tmp_path, server, resolve_to, load_wb):
+    filename = "headers.xlsx"
+    expected_path = tmp_path / filename
+    resolve_to(expected_path)
+    actual_result = server.create_spreadsheet_sync(filename=filename, format='xlsx', headers=["Date", "Amount"], sheet_name='Q1')
+
+    assert actual_result["success"] is True
+    ws = load_wb(expected_path)["Q1"]
+    header_row = next(ws.iter_rows(max_row=1))
+    assert [cell.value for cell in header_row] == ["Date", "Amount"]
+    assert all(cell.font.bold for cell in header_row)
+
+
+@pytest.mark.asyncio
+async def test_create_spreadsheet_runs_off_the_event_loop(tmp_path, server, resolve_to, monkeypatch):
+    calls = []
+    create_sync = server.create_spreadsheet_sync
+
+    def _record(*args, **kwargs):
+        calls.append(threading.current_thread())
+        return create_sync(*args, **kwargs)
+
+    monkeypatch.setattr(server, "create_spreadsheet_sync", _record)
+    expected_path = tmp_path / "async.xlsx"
+    resolve_to(expected_path)
+    actual_result = await server.create_spreadsheet(filename="async.xlsx", format='xlsx', headers=None, sheet_name='Sheet1')
+
+    assert actual_result["path"] == os.fspath(expected_path)
+    assert expected_path.exists()
+    assert calls and calls[0] is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_workbook_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    server.create_spreadsheet_sync("threads.xlsx")
+    threads = []
+    for name in ("_load_workbook", "_commit_workbook"):
+        original = getattr(server, name)
+
+        def _record(*args, _original=original, **kwargs):
+            threads.append(threading.current_thread())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(server, name, _record)
+
+    await server.update_cell("threads.xlsx", "Sheet1", "A1", 1)
+
+    assert len(threads) == 2
+    assert all(t is not threading.main_thread() for t in threads)
+
+
+def test_create_spreadsheet_excel_xlsxwriter_backend(tmp_path, load_wb):
+    pytest.importorskip("xlsxwriter")
+    server = SpreadsheetServer(base_path=str(tmp_path), backend="xlsxwriter")
+    actual_result = server.create_spreadsheet_sync(filename="fast.xlsx", format='xlsx', headers=["Date", "Amount"], sheet_name='Q1')
+
+    assert actual_result["path"] == os.fspath((tmp_path / "fast.xlsx").resolve())
+    header_row = next(load_wb(actual_result["path"])["Q1"].iter_rows(max_row=1))
+    assert [cell.value for cell in header_row] == ["Date", "Amount"]
+    assert all(cell.font.bold for cell in header_row)
+
+
+@pytest.mark.asyncio
+async def test_list_files(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    (tmp_path / "sales.xlsx").write_bytes(b"x" * 3)
+    (tmp_path / "sales.csv").write_text("a,b\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    (tmp_path / "archive.xlsx").mkdir()
+
+    result = await server.list_files()
+    assert sorted((f["name"], f["size"], f["type"]) for f in result["files"]) == [
+        ("sales.csv", 4, ".csv"), ("sales.xlsx", 3, ".xlsx")]
+
+    result = await server.list_files(pattern="*.xlsx")
+    assert [f["name"] for f in result["files"]] == ["sales.xlsx"]
+    assert result["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_spreadsheet_excel(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Date", "Amount"])
+    ws.append([datetime.date(2024, 1, 1), 100])
+    ws.append([None, "=SUM(B2:B2)"])
+    wb.save(tmp_path / "sales.xlsx")
+
+    result = await server.read_spreadsheet("sales.xlsx")
+    assert result["sheet_name"] == "Data"
+    assert result["data"] == [["Date", "Amount"], ["2024-01-01T00:00:00", 100], [None, "=SUM(B2:B2)"]]
+    assert (result["rows"], result["columns"]) == (3, 2)
+
+    result = await server.read_spreadsheet("sales.xlsx", sheet="Data", max_rows=1)
+    assert result["data"] == [["Date", "Amount"]]
+
+
+@pytest.mark.asyncio
+async def test_workbook_cache_tracks_disk(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    path = tmp_path / "cache.xlsx"
+    Workbook().save(path)
+
+    await server.update_cell("cache.xlsx", "Sheet", "A1", 1)
+    await server.update_cell("cache.xlsx", "Sheet", "A2", 2)
+    assert path.resolve() in server._wb_cache
+    ws = load_workbook(path)["Sheet"]
+    assert (ws["A1"].value, ws["A2"].value) == (1, 2)
+
+    # A failed edit must not leave its workbook in the cache
+    with pytest.raises(ValueError):
+        await server.update_cell("cache.xlsx", "Sheet", "bogus", 3)
+    assert path.resolve() not in server._wb_cache
+
+    # Changes made behind the server's back are picked up
+    external = Workbook()
+    external.active["A1"] = "external"
+    external.save(path)
+    result = await server.get_formula("cache.xlsx", "Sheet", "A1")
+    assert result["formula_or_value"] == "external"
+
+
+@pytest.mark.asyncio
+async def test_apply_ops_is_all_or_nothing(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    path = tmp_path / "batch.xlsx"
+    Workbook().save(path)
+
+    result = await server.apply_ops("batch.xlsx", [
+        {"op": "update_cell", "sheet": "Sheet", "cell": "A1", "value": 10},
+        {"op": "set_formula", "sheet": "Sheet", "cell": "A2", "formula": "=A1*2"},
+        {"op": "format_cells", "sheet": "Sheet", "cell_range": "A1:A2", "bold": True},
+        {"op": "freeze_panes", "sheet": "Sheet", "cell": "A2"},
+    ])
+    assert result["success"] is True
+    assert result["ops_applied"] == 4
+    ws = load_workbook(path)["Sheet"]
+    assert (ws["A1"].value, ws["A2"].value, ws.freeze_panes) == (10, "=A1*2", "A2")
+    assert ws["A2"].font.bold
+
+    result = await server.apply_ops("batch.xlsx", [
+        {"op": "update_cell", "sheet": "Sheet", "cell": "B1", "value": "lost"},
+        {"op": "freeze_panes", "sheet": "Missing", "cell": "A2"},
+    ])
+    assert result["success"] is False
+    assert result["failed_op"] == 1
+    assert load_workbook(path)["Sheet"]["B1"].value is None
+
+    with pytest.raises(ValueError):
+        await server.apply_ops("batch.xlsx", [{"op": "delete_spreadsheet"}])
+    with pytest.raises(ValueError, match="Unsupported batch op"):
+        await server.apply_ops("batch.xlsx", ["update_cell"])
+
+
+@pytest.mark.asyncio
+async def test_apply_ops_without_ops_skips_load_and_save(tmp_path, monkeypatch):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    Workbook().save(tmp_path / "batch.xlsx")
+    before = (tmp_path / "batch.xlsx").stat().st_mtime_ns
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("an empty batch must not touch the workbook")
+
+    monkeypatch.setattr(server, "_load", _fail)
+    assert await server.apply_ops("batch.xlsx", []) == {"success": True, "ops_applied": 0, "results": []}
+    assert (tmp_path / "batch.xlsx").stat().st_mtime_ns == before
+    with pytest.raises(FileNotFoundError, match="File not found: missing.xlsx"):
+        await server.apply_ops("missing.xlsx", [])
+
+
+@pytest.mark.asyncio
+async def test_read_spreadsheet_csv(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    (tmp_path / "rows.csv").write_text('a,b\n1,"multi\nline"\n2,3\n', encoding="utf-8")
+
+    result = await server.read_spreadsheet("rows.csv")
+    assert result["data"] == [["a", "b"], ["1", "multi\nline"], ["2", "3"]]
+    assert (result["rows"], result["columns"]) == (3, 2)
+
+    result = await server.read_spreadsheet("rows.csv", max_rows=2)
+    assert result["data"] == [["a", "b"], ["1", "multi\nline"]]
+
+
+def test_clear_cells_openpyxl_internals():
+    # _clear_cells uses private openpyxl attributes; fail here if a release changes them
+    ws = Workbook().active
+    ws.append([1, 2])
+    ws.append([3])
+    assert set(ws._cells) == {(1, 1), (1, 2), (2, 1)}
+    assert ws._current_row == 2
+
+    SpreadsheetServer._clear_cells(ws)
+    assert (ws.max_row, ws.max_column, list(ws.values)) == (1, 1, [])
+    ws.append(["again"])
+    assert [list(r) for r in ws.values] == [["again"]]
+
+
+@pytest.mark.asyncio
+async def test_write_spreadsheet_overwrite_keeps_sheet_settings(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for i in range(10):
+        ws.append([i, i * 2])
+    ws.column_dimensions["A"].width = 30
+    ws.row_dimensions[1].height = 40
+    ws.freeze_panes = "A2"
+    ws.merge_cells("D1:E1")
+    ws.sheet_properties.tabColor = "FF0000"
+    ws.add_data_validation(DataValidation(type="whole", sqref="A1:A10"))
+    ws.conditional_formatting.add("B1:B10", CellIsRule(operator="greaterThan", formula=["5"], font=Font(bold=True)))
+    wb.create_sheet("Other")["A1"] = "keep"
+    wb.save(tmp_path / "data.xlsx")
+    await server.create_chart("data.xlsx", "Data", "bar", "A1:B10")
+    await server.format_cells("data.xlsx", "Data", "C:C", bold=True)
+
+    result = await server.write_spreadsheet("data.xlsx", [["x", "y"]], sheet="Data")
+    assert result == {"success": True, "rows_written": 1, "sheet": "Data"}
+
+    wb = load_workbook(tmp_path / "data.xlsx")
+    assert wb.sheetnames == ["Data", "Other"]
+    ws = wb["Data"]
+    # the D1:E1 merge survives, so row 1 reaches column E
+    assert [list(r) for r in ws.iter_rows(values_only=True)] == [["x", "y", None, None, None]]
+    assert ws.column_dimensions["A"].width == 30
+    assert ws.column_dimensions["C"].font.bold
+    assert ws.row_dimensions[1].height == 40
+    assert ws.freeze_panes == "A2"
+    assert [str(r) for r in ws.merged_cells.ranges] == ["D1:E1"]
+    assert ws.sheet_properties.tabColor.rgb == "00FF0000"
+    assert len(ws.data_validations.dataValidation) == 1
+    assert len(ws.conditional_formatting) == 1
+    assert len(ws._charts) == 1
+    assert wb.active.title == "Data"
+    assert wb["Other"]["A1"].value == "keep"
+
+
+@pytest.mark.parametrize("stdin_kind", ["pipe", "file"])
+def test_stdio_round_trip(tmp_path, stdin_kind):
+    requests = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize"},
+        {"jsonrpc": "2.0", "id": "two", "method": "tools/call",
+         "params": {"name": "create_spreadsheet", "arguments": {"filename": "io.csv", "format": "csv"}}},
+        {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+         "params": {"name": "write_spreadsheet", "arguments": {"filename": "io.csv", "data": [["é", 1]]}}},
+    ]
+    payload = "".join(json.dumps(r) + "\n" for r in requests).encode("utf-8")
+    command = [sys.executable, os.fspath(Path(spreadsheet_server.__file__))]
+    if stdin_kind == "pipe":
+        proc = subprocess.run(command, input=payload, cwd=tmp_path, capture_output=True, timeout=60)
+    else:
+        (tmp_path / "requests.jsonl").write_bytes(payload)
+        with open(tmp_path / "requests.jsonl", "rb") as stdin:
+            proc = subprocess.run(command, stdin=stdin, cwd=tmp_path, capture_output=True, timeout=60)
+
+    assert proc.returncode == 0, proc.stderr
+    responses = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert [r["id"] for r in responses] == [1, "two", 3]
+    assert json.loads(responses[2]["result"]["content"][0]["text"])["rows_written"] == 1
+    assert (tmp_path / "spreadsheets" / "io.csv").read_bytes() == "é,1\r\n".encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_stream_lines_skips_oversized_lines():
+    reader = asyncio.StreamReader(limit=64)
+    # Oversized lines: one ending in a newline, one cut off by EOF
+    reader.feed_data(b'{"a":1}\n' + b"x" * 200 + b'\n{"b":2}\n' + b"y" * 200)
+    reader.feed_eof()
+    lines = [line async for line in spreadsheet_server._stream_lines(reader)]
+
+    assert lines == [b'{"a":1}\n', None, b'{"b":2}\n', None]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_calls_on_one_file_keep_every_edit(tmp_path, capsys):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    Workbook().save(tmp_path / "shared.xlsx")
+
+    await asyncio.gather(*(
+        spreadsheet_server.handle_tool_call(i, server, "append_row",
+                                            {"filename": "shared.xlsx", "row_data": [i]})
+        for i in range(8)))
+
+    responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(r["id"] for r in responses if "result" in r) == list(range(8))
+    ws = load_workbook(tmp_path / "shared.xlsx").active
+    assert sorted(row[0] for row in ws.iter_rows(values_only=True)) == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_naming_one_file_differently_keep_every_edit(tmp_path, capsys):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    (tmp_path / "sub").mkdir()
+    await spreadsheet_server.handle_tool_call(0, server, "create_spreadsheet", {"filename": "shared"})
+
+    names = ["shared.xlsx", "./shared.xlsx", "sub/../shared.xlsx", str(tmp_path / "shared.xlsx")]
+    await asyncio.gather(*(
+        spreadsheet_server.handle_tool_call(i, server, "append_row",
+                                            {"filename": names[i % len(names)], "row_data": [i]})
+        for i in range(8)))
+
+    responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert all("result" in r for r in responses)
+    ws = load_workbook(tmp_path / "shared.xlsx").active
+    assert sorted(row[0] for row in ws.iter_rows(values_only=True)) == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_format_cells_styles_whole_columns_and_rows(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    wb = Workbook()
+    for i in range(3):
+        wb.active.append([i, i, i])
+    wb.save(tmp_path / "styled.xlsx")
+
+    result = await server.format_cells("styled.xlsx", "Sheet", "B:C", bold=True, bg_color="#00FF00")
+    assert result == {"success": True, "range": "B:C", "cells_formatted": 6}
+    result = await server.set_text_wrap("styled.xlsx", "Sheet", "2:2")
+    assert result["cells_affected"] == 3
+
+    ws = load_workbook(tmp_path / "styled.xlsx")["Sheet"]
+    for column in "BC":
+        assert ws.column_dimensions[column].font.bold
+        assert ws.column_dimensions[column].fill.fgColor.rgb == "FF00FF00"
+        assert all(cell.font.bold for cell in ws[column])
+    assert not ws["A1"].font.bold
+    assert ws.row_dimensions[2].alignment.wrap_text
+    assert all(cell.alignment.wrap_text for cell in ws[2])
+
+    result = await server.format_cells("styled.xlsx", "Sheet", "bogus", bold=True)
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename", ["log.xlsx", "log.csv"])
+async def test_append_rows(tmp_path, filename):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    server.create_spreadsheet_sync(filename, format=filename.rsplit(".", 1)[1], headers=["n", "sq"])
+
+    result = await server.append_rows(filename, [[i, i * i] for i in range(1, 4)])
+    assert result["rows_appended"] == 3
+    await server.append_row(filename, [4, 16])
+
+    data = (await server.read_spreadsheet(filename))["data"]
+    assert [[str(v) for v in row] for row in data] == [
+        ["n", "sq"], ["1", "1"], ["2", "4"], ["3", "9"], ["4", "16"]]
+
+
+_NOOP_FORMATTING_CALLS = [
+    lambda s, f: s.set_column_format(f, "Sheet", "A"),
+    lambda s, f: s.set_row_format(f, "Sheet", 1, height=0),
+    lambda s, f: s.format_cells(f, "Sheet", "A1:B2"),
+    lambda s, f: s.set_cell_format(f, "Sheet", "A1"),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call", _NOOP_FORMATTING_CALLS)
+async def test_noop_formatting_skips_load_and_save(tmp_path, monkeypatch, call):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    Workbook().save(tmp_path / "styled.xlsx")
+    before = (tmp_path / "styled.xlsx").stat().st_mtime_ns
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("no-op formatting must not touch the workbook")
+
+    monkeypatch.setattr(server, "_load", _fail)
+    result = await call(server, "styled.xlsx")
+    assert result["success"] is True
+    assert result["noop"] is True
+    assert (tmp_path / "styled.xlsx").stat().st_mtime_ns == before
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call", _NOOP_FORMATTING_CALLS)
+@pytest.mark.parametrize("filename, error, match", [
+    ("missing.xlsx", FileNotFoundError, "File not found: missing.xlsx"),
+    ("../escape.xlsx", ValueError, "Path traversal not allowed"),
+])
+async def test_noop_formatting_still_checks_the_path(server, call, filename, error, match):
+    with pytest.raises(error, match=match):
+        await call(server, filename)
+
+
+@pytest.mark.asyncio
+async def test_read_spreadsheet_csv_arrow_matches_csv_module(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    rows = [["id", "note", "amount"]] + [[str(i), f'row "{i}"\nnext', ""] for i in range(40000)]
+    await server.create_spreadsheet("big.csv", format="csv")
+    await server.write_spreadsheet("big.csv", rows)
+    assert (tmp_path / "big.csv").stat().st_size >= spreadsheet_server.CSV_ARROW_MIN_SIZE
+
+    fast = await server.read_spreadsheet("big.csv")
+    monkeypatch.setattr(spreadsheet_server, "pacsv", None)
+    assert fast == await server.read_spreadsheet("big.csv")
+    assert fast["data"][1] == ["0", 'row "0"\nnext', ""]
+
+
+@pytest.mark.asyncio
+async def test_write_many(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    for name in ("a.xlsx", "b.xlsx", "c.csv"):
+        server.create_spreadsheet_sync(name, format=name.rsplit(".", 1)[1])
+
+    result = await server.write_many([
+        {"filename": "a.xlsx", "data": [["a1"]]},
+        {"filename": "b.xlsx", "data": [["b1"]], "sheet": "Extra"},
+        {"filename": "a.xlsx", "data": [["a2"]], "append": True},
+        {"filename": "c.csv", "data": [["c1"]]},
+        {"filename": "missing.xlsx", "data": [["x"]]},
+    ])
+
+    assert result["success"] is False
+    assert [r["success"] for r in result["results"]] == [True, True, True, True, False]
+    assert result["results"][4] == {"filename": "missing.xlsx", "success": False,
+                                    "error": "File not found: missing.xlsx"}
+    assert [row for row in load_workbook(tmp_path / "a.xlsx").active.values] == [("a1",), ("a2",)]
+    assert load_workbook(tmp_path / "b.xlsx").sheetnames == ["Sheet1", "Extra"]
+    assert (await server.read_spreadsheet("c.csv"))["data"] == [["c1"]]
+
+
+@pytest.mark.asyncio
+async def test_write_many_reports_malformed_jobs(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    server.create_spreadsheet_sync("a.csv", format="csv")
+
+    result = await server.write_many([
+        "a.csv",
+        {"data": [["x"]]},
+        {"filename": "a.csv"},
+        {"filename": "a.csv", "data": [["ok"]]},
+    ])
+
+    assert result["success"] is False
+    assert result["results"] == [
+        {"filename": None, "success": False, "error": "Job 0: must be an object"},
+        {"filename": None, "success": False, "error": "Job 1: missing filename"},
+        {"filename": "a.csv", "success": False, "error": "Job 2: missing data"},
+        {"filename": "a.csv", "success": True, "rows_written": 1},
+    ]
+    assert (await server.read_spreadsheet("a.csv"))["data"] == [["ok"]]
+
+
+@pytest.mark.asyncio
+async def test_get_formula_does_not_create_cells(tmp_path):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    server.create_spreadsheet_sync("a.xlsx", headers=["h"])
+    await server.append_row("a.xlsx", [1])
+
+    result = await server.get_formula("a.xlsx", "Sheet1", "Z1000")
+    assert result["formula_or_value"] is None
+    # get_formula reads openpyxl's private _cells; fail here if a release renames or rekeys it
+    ws = server._wb_cache[(tmp_path / "a.xlsx").resolve()][1]["Sheet1"]
+    assert set(ws._cells) == {(1, 1), (2, 1)}
+    assert (await server.get_formula("a.xlsx", "Sheet1", "$A$2"))["formula_or_value"] == 1
+
+    assert (await server.append_row("a.xlsx", [2]))["row_number"] == 3
+    result = await server.read_spreadsheet("a.xlsx")
+    assert (result["rows"], result["columns"]) == (3, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dimension", [b'<dimension ref="A1:B2"/>', b""], ids=["stale", "missing"])
+async def test_read_spreadsheet_excel_ignores_dimension_tag(tmp_path, dimension):
+    wb = Workbook()
+    ws = wb.active
+    ws.append([1, 2, 3])
+    ws.append([4])
+    ws["D4"] = 9
+    wb.save(tmp_path / "src.xlsx")
+    with zipfile.ZipFile(tmp_path / "src.xlsx") as src, zipfile.ZipFile(tmp_path / "dim.xlsx", "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*"/>', dimension, data)
+            dst.writestr(item, data)
+
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    result = await server.read_spreadsheet("dim.xlsx")
+    assert result["data"] == [[1, 2, 3, None], [4, None, None, None],
+                              [None, None, None, None], [None, None, None, 9]]
+    assert (result["rows"], result["columns"]) == (4, 4)
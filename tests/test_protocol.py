@@ -0,0 +1,69 @@
+import json
+
+import pytest
+import spreadsheet_server
+from spreadsheet_server import SpreadsheetServer
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_id", [7, "req-7"])
+async def test_tools_list_echoes_request_id(capsys, request_id):
+    await spreadsheet_server.handle_tools_list(request_id)
+
+    response = json.loads(capsys.readouterr().out)
+    assert response["jsonrpc"] == "2.0"
+    assert response["id"] == request_id
+    assert response["result"] == spreadsheet_server._TOOLS_LIST_RESULT
+
+
+def test_every_listed_tool_is_a_server_method():
+    names = [tool["name"] for tool in spreadsheet_server._TOOLS_LIST_RESULT["tools"]]
+    assert len(names) == len(set(names))
+    assert all(callable(getattr(SpreadsheetServer, name, None)) for name in names)
+
+
+@pytest.mark.asyncio
+async def test_tool_result_is_embedded_as_json_text(tmp_path, capsys):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    tricky = ['say "hi"', "back\\slash", "tab\tnew\nline", "é ☃  ", "\x00"]
+    await server.create_spreadsheet("tricky.csv", format="csv")
+    await server.write_spreadsheet("tricky.csv", [tricky])
+
+    await spreadsheet_server.handle_tool_call("r1", server, "read_spreadsheet", {"filename": "tricky.csv"})
+
+    response = json.loads(capsys.readouterr().out)
+    assert response["id"] == "r1"
+    assert json.loads(response["result"]["content"][0]["text"]) == await server.read_spreadsheet("tricky.csv")
+    assert json.loads(response["result"]["content"][0]["text"])["data"] == [tricky]
+
+
+@pytest.mark.parametrize("text", [
+    '{"v": 123456789012345678901234}',
+    '{"v": -9223372036854775809}',
+    '{"v": 18446744073709551616, "s": "1234567890123456789"}',
+    '{"v": 1e400}',
+    '{"v": 1.5, "w": [1, "é"]}',
+])
+def test_json_loads_matches_stdlib(text):
+    assert spreadsheet_server.json_loads(text.encode("utf-8")) == json.loads(text)
+
+
+@pytest.mark.parametrize("value", [2 ** 64, -2 ** 63 - 1, 123456789012345678901234, [1, "é"]])
+def test_json_dumps_round_trips(value):
+    assert json.loads(spreadsheet_server.json_dumps({"v": value})) == {"v": value}
+
+
+@pytest.mark.asyncio
+async def test_big_integer_cell_keeps_every_digit(tmp_path, capsys):
+    server = SpreadsheetServer(base_path=str(tmp_path))
+    server.create_spreadsheet_sync("big.xlsx")
+    request = spreadsheet_server.json_loads(
+        b'{"filename": "big.xlsx", "sheet": "Sheet1", "cell": "A1", "value": 123456789012345678901234}')
+
+    await spreadsheet_server.handle_tool_call(1, server, "update_cell", request)
+    await spreadsheet_server.handle_tool_call(2, server, "get_formula",
+                                              {"filename": "big.xlsx", "sheet": "Sheet1", "cell": "A1"})
+
+    responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert json.loads(responses[1]["result"]["content"][0]["text"])["formula_or_value"] == \
+        123456789012345678901234